@@ -1,17 +1,51 @@
-from typing import Callable, List, Dict, Any
+from typing import Callable, List, Dict, Any, Optional, Tuple, Sequence, Iterable, Iterator
 import mysql.connector
 from mysql.connector import InterfaceError
 from mysql.connector.connection import MySQLCursor
+from mysql.connector.cursor import MySQLCursorPrepared
+from mysql.connector.pooling import MySQLConnectionPool
+import functools
+from collections import OrderedDict
 import os
 import logging
+import threading
 import settings
 
 LOG = logging.getLogger(__name__)
 
+# Column names per table, as they are pure metadata and (practically) never change at runtime
+_COLUMNS_CACHE: Dict[str, List[str]] = {}
+_COLUMNS_CACHE_LOCK = threading.Lock()
+# Maximum number of values per `IN (...)` list
+_IN_CHUNK_SIZE = 1000
 
-def _connect_db() -> mysql.connector.connection:
+
+def invalidate_columns(table_name: Optional[str] = None):
+    """
+    Drops cached column names, so they are re-read from the database on the next `get_db_columns` call.
+
+    :param table_name: Table whose columns should be dropped. If `None`, the entire cache is cleared.
+    """
+    with _COLUMNS_CACHE_LOCK:
+        if table_name is None:
+            _COLUMNS_CACHE.clear()
+        else:
+            _COLUMNS_CACHE.pop(table_name, None)
+
+
+_POOL: Optional[MySQLConnectionPool] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _create_pool() -> Optional[MySQLConnectionPool]:
+    invalidate_columns()
     if os.getenv("OTRS_EXP_DB_PW"):
-        return mysql.connector.connect(
+        return MySQLConnectionPool(
+            pool_name="otrs",
+            pool_size=settings.DB_POOL_SIZE,
+            # Skip the session reset (i.e. a full re-authentication on MySQL 5.6) when returning connections
+            pool_reset_session=False,
+            autocommit=True,
             host=settings.DB_HOST,
             database=settings.DB_NAME,
             user=settings.DB_USER,
@@ -21,88 +55,218 @@ def _connect_db() -> mysql.connector.connection:
         LOG.error("No password for database provided in OTRS_EXP_DB_PW! Skipping DB connection!")
 
 
-# noinspection PyPackageRequirements
-db: mysql.connector.connection = _connect_db()
+def _get_pool() -> MySQLConnectionPool:
+    """
+    Returns the connection pool, which is created on first use. This way, importing this module doesn't connect to the
+    database yet.
+    """
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None:
+            _POOL = _create_pool()
+        if _POOL is None:
+            raise InterfaceError("No database connection available, as OTRS_EXP_DB_PW is not set!")
+        return _POOL
 
 
-def auto_cursor(func: Callable) -> Callable:
+def auto_connection(func: Callable) -> Callable:
     """
-    A function decorator which passes `cursor: PostgresCursor` to the function,
-    checks whether `db` is currently connected (and reconnects, if necessary),
-    closes `cursor` again and executed `db.commit()` after everything is done.
+    A function decorator which checks out a connection from the pool (see `_get_pool`) and passes it as `connection` to
+    the function. After everything is done, the connection is returned to the pool.
+    Connections run in autocommit mode, so there is no extra `COMMIT` round trip after (mostly read-only) statements.
+    The pool itself takes care of reconnecting connections, which have been lost in the meantime.
     """
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        global db
-        if not db.is_connected():
-            print("Database is not connected! Attempting reconnect...")
-            db = _connect_db()
+        if "connection" in kwargs.keys():
+            return func(*args, **kwargs)
 
-        if "cursor" in kwargs.keys():
-            result = func(*args, **kwargs)
-        else:
-            c = db.cursor(prepared=True)
-            result = func(*args, **kwargs, cursor=c)
-            try:
-                # Fetch all remaining results, otherwise an error is raised by MySQL, in case the user didn't fetch
-                c.fetchall()
-            except mysql.connector.ProgrammingError:
-                # If no records were present, this exception is raised. Everything is fine in this case.
-                pass
-        db.commit()
+        connection = _get_pool().get_connection()
+        try:
+            result = func(*args, **kwargs, connection=connection)
+        except InterfaceError:
+            # Discard the broken socket, so the pool opens a fresh one on the next checkout
+            LOG.warning("Lost connection to database! Discarding it...")
+            _invalidate_statements(connection.connection_id)
+            connection.disconnect()
+            invalidate_columns()
+            raise
+        finally:
+            # Returns the connection to the pool
+            connection.close()
         return result
 
     return wrapper
 
 
-@auto_cursor
-def _action_where(action: str, table_name: str, **kwargs) -> List[Dict[str, Any]]:
+def _cursor_decorator(**cursor_options) -> Callable[[Callable], Callable]:
+    """
+    Builds a function decorator which checks out a connection (see `auto_connection`) and passes
+    `cursor: MySQLCursor` (created with `cursor_options`) to the function. `cursor` is closed again after everything
+    is done.
+    """
+    buffered = cursor_options.get("buffered", False)
+
+    def decorator(func: Callable) -> Callable:
+        @auto_connection
+        def with_cursor(*args, connection, **kwargs):
+            c = connection.cursor(**cursor_options)
+            try:
+                result = func(*args, **kwargs, cursor=c)
+                if not buffered:
+                    try:
+                        # Fetch all remaining results of streaming cursors, otherwise an error is raised by MySQL, in
+                        # case the user didn't fetch. Buffered cursors already read everything during `execute`.
+                        c.fetchall()
+                    except mysql.connector.ProgrammingError:
+                        # If no records were present, this exception is raised. Everything is fine in this case.
+                        pass
+            finally:
+                c.close()
+            return result
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if "cursor" in kwargs.keys():
+                return func(*args, **kwargs)
+            return with_cursor(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+def auto_cursor(func: Optional[Callable] = None, *, buffered: bool = True) -> Callable:
+    """
+    A function decorator which passes a cursor returning rows as tuples (see `_cursor_decorator`). The cursor is
+    buffered, i.e. it reads the entire result set during `execute`. Use `@auto_cursor(buffered=False)` to stream very
+    large result sets instead.
+    """
+    decorator = _cursor_decorator(buffered=buffered)
+    return decorator if func is None else decorator(func)
+
+
+# Passes a buffered cursor, which returns rows as `dict`s mapping column names to values
+auto_dict_cursor = _cursor_decorator(dictionary=True, buffered=True)
+
+# Prepared statements of `_action_where` per connection ID (least recently used first) and statement. The server keeps
+# them parsed, so repeated queries skip parsing (mysql-connector still resets a statement before every reuse though,
+# i.e. it isn't a round trip less). The statement string is kept as well, as cursors only reuse a prepared statement,
+# if the very same string object is executed again.
+_STMT_CACHE: "OrderedDict[int, Dict[str, Tuple[str, MySQLCursorPrepared]]]" = OrderedDict()
+_STMT_CACHE_LOCK = threading.Lock()
+
+
+def _invalidate_statements(connection_id: int):
+    with _STMT_CACHE_LOCK:
+        _STMT_CACHE.pop(connection_id, None)
+
+
+def _prepared_statement(connection, sql_statement: str) -> Tuple[str, MySQLCursorPrepared]:
+    with _STMT_CACHE_LOCK:
+        statements = _STMT_CACHE.get(connection.connection_id)
+        if statements is None:
+            statements = _STMT_CACHE[connection.connection_id] = {}
+            # At most `DB_POOL_SIZE` connections are open at a time, so the least recently used ones beyond that have
+            # been replaced (e.g. by a reconnect of the pool), and their statements ended along with their session
+            while len(_STMT_CACHE) > settings.DB_POOL_SIZE:
+                _STMT_CACHE.popitem(last=False)
+        else:
+            _STMT_CACHE.move_to_end(connection.connection_id)
+        if sql_statement not in statements:
+            statements[sql_statement] = (sql_statement, connection.cursor(prepared=True))
+        return statements[sql_statement]
+
+
+def _evict_statement(connection, sql_statement: str):
+    """
+    Drops a prepared statement of the (checked out) `connection` from the cache and deallocates it on the server.
+    """
+    with _STMT_CACHE_LOCK:
+        _, cursor = _STMT_CACHE.get(connection.connection_id, {}).pop(sql_statement, (None, None))
+    if cursor is not None:
+        try:
+            cursor.close()
+        except mysql.connector.errors.Error:
+            pass
+
+
+def _check_columns(table_name: str, columns: Iterable[str], **kwargs) -> bool:
+    """
+    Identifiers can't be passed as statement parameters, hence only known tables and columns may be put into a statement.
+
+    :param table_name: Name of the table
+    :param columns: Column names, which have to exist in the table
+    :param kwargs: Passed on to `get_db_columns`
+    :return: Whether the table exists. Unknown columns of an existing table raise a value error.
+    """
+    table_columns = get_db_columns(table_name, **kwargs)
+    if not table_columns:
+        return False
+    unknown_columns = set(columns).difference(table_columns)
+    if unknown_columns:
+        raise ValueError(f"Unknown columns for table {table_name}: {', '.join(sorted(unknown_columns))}")
+    return True
+
+
+@auto_connection
+def _action_where(action: str, table_name: str, columns: Optional[Sequence[str]] = None,
+                  **kwargs) -> List[Dict[str, Any]]:
     """
         Executes a `SELECT` or `DELETE` (or any other SQL action statement) in the form of `<action> * FROM table_name WHERE ...`
         and returns the result. Search terms are combined as conjunction with `AND`.
         If the table doesn't exist, the result will be an empty list.
+        Statements are prepared once per connection and reused afterwards.
         :param action: Either "select" or "delete". Everything else, raises a value error.
         :param table_name: Name of the table to be searched.
+        :param columns: Columns to be selected (only for SELECT). If `None`, all columns are selected.
         :param kwargs: Keys are column names and values are search terms. Wildcards are not supported, as they are escaped.
         :return: A `list` containing `dict`s, each mapping column names to values of a data row. The list might be empty.
         """
-    cursor = kwargs.pop("cursor")
+    connection = kwargs.pop("connection")
     if action is None or action.upper() not in ["SELECT", "DELETE"]:
         raise ValueError(f"Invalid action requested! Must be SELECT or DELETE! Got {action}.")
-    sql_where_clauses = [f'{k} = %s' for k in kwargs.keys()]
-    sql_statement = f'{action} {"*" if action.upper() == "SELECT" else ""} FROM {table_name}' \
+    projection = "*" if columns is None else ", ".join(columns)
+    if not _check_columns(table_name, [*kwargs.keys(), *(columns or [])], connection=connection):
+        return []
+
+    # Sorted, so the same search terms always result in the same (cached) statement
+    search_columns = sorted(kwargs.keys())
+    sql_where_clauses = [f'{k} = %s' for k in search_columns]
+    sql_statement = f'{action} {projection if action.upper() == "SELECT" else ""} FROM {table_name}' \
                     f'{" WHERE " if len(kwargs) > 0 else ";"}' \
                     f'{" AND ".join(sql_where_clauses)};'
 
+    sql_statement, cursor = _prepared_statement(connection, sql_statement)
     try:
-        cursor.execute(sql_statement, tuple(kwargs.values()))
+        cursor.execute(sql_statement, tuple(kwargs[k] for k in search_columns))
+    except InterfaceError:
+        raise
     except mysql.connector.errors.Error:
+        _evict_statement(connection, sql_statement)
         return []
-    search_results = None
-    try:
-        search_results = cursor.fetchall()
-        # Map each result tuple (= 1 row in the DB table) to dict with column names as keys
-        col_names = get_db_columns(table_name)
-        search_results = list(map(
-            lambda sr: {col_names[i]: sr[i] for i in range(len(col_names))},
-            search_results
-        ))
-    except mysql.connector.ProgrammingError:
-        pass
-    return search_results if search_results is not None else []
+    # DELETE statements don't produce a result set
+    if not cursor.with_rows:
+        return []
+    col_names = cursor.column_names
+    return [dict(zip(col_names, row)) for row in cursor.fetchall()]
 
 
-def select_where(table_name: str, **kwargs) -> List[Dict[str, Any]]:
+def select_where(table_name: str, columns: Optional[Sequence[str]] = None, **kwargs) -> List[Dict[str, Any]]:
     """
     Executes a SELECT query on table `table_name`. Any keyword arguments are used as WHERE clauses, where keys are
     column names and values are "=" comparisons (i.e. ("t", foo=bar) becomes SELECT * from t WHERE foo=bar;).
     If no keyword arguments are specified, the entire table will be returned (often a good idea, as Python is probably
     faster than the database, plus SQL is a pain to write more complex functions with).
+    Wide tables (e.g. `ticket` or `article`) should be queried with `columns`, so only the required columns are
+    transferred.
 
     :param table_name: Table on which the query should be executed
+    :param columns: Columns to be returned. If `None`, all columns are returned.
     :param kwargs: Any additional search terms
     :return: List of `dict`s, where each `dict` represents a row from the table. Keys are column names.
     """
-    return _action_where("SELECT", table_name, **kwargs)
+    return _action_where("SELECT", table_name, columns, **kwargs)
 
 
 def delete_where(table_name: str, **kwargs) -> List[Dict[str, Any]]:
@@ -117,8 +281,117 @@ def delete_where(table_name: str, **kwargs) -> List[Dict[str, Any]]:
     return _action_where("DELETE", table_name, **kwargs)
 
 
+def _in_statements(action: str, table_name: str, column: str,
+                   values: Sequence[Any]) -> Iterator[Tuple[str, Tuple[Any, ...]]]:
+    """
+    Splits `values` into chunks of at most `_IN_CHUNK_SIZE` values (keeping statements well below `max_allowed_packet`)
+    and yields a `<action> FROM table_name WHERE column IN (...)` statement along with its parameters for each chunk.
+    """
+    for i in range(0, len(values), _IN_CHUNK_SIZE):
+        chunk = tuple(values[i:i + _IN_CHUNK_SIZE])
+        yield f'{action} FROM {table_name} WHERE {column} IN ({", ".join(["%s"] * len(chunk))});', chunk
+
+
+@auto_dict_cursor
+def _select_in(table_name: str, column: str, values: Sequence[Any], **kwargs) -> Dict[Any, List[Dict[str, Any]]]:
+    cursor = kwargs.pop("cursor")
+    rows_by_value: Dict[Any, List[Dict[str, Any]]] = {value: [] for value in values}
+    for sql_statement, params in _in_statements("SELECT *", table_name, column, values):
+        cursor.execute(sql_statement, params)
+        for row in cursor.fetchall():
+            rows_by_value.setdefault(row[column], []).append(row)
+    return rows_by_value
+
+
+@auto_dict_cursor
+def _delete_in(table_name: str, column: str, values: Sequence[Any], **kwargs) -> int:
+    cursor = kwargs.pop("cursor")
+    deleted = 0
+    for sql_statement, params in _in_statements("DELETE", table_name, column, values):
+        cursor.execute(sql_statement, params)
+        deleted += cursor.rowcount
+    return deleted
+
+
+def select_in(table_name: str, column: str, values: Sequence[Any]) -> Dict[Any, List[Dict[str, Any]]]:
+    """
+    Batched variant of `select_where` for many lookups on the same column: Executes
+    `SELECT * FROM table_name WHERE column IN (values)`, which needs a single round trip instead of one per value.
+
+    :param table_name: Table on which the query should be executed
+    :param column: Column, which is compared to `values`
+    :param values: Search terms
+    :return: Mapping of each value to the list of rows (as `dict`s, keys are column names) matching it. The lists
+             might be empty.
+    """
+    if not values or not _check_columns(table_name, [column]):
+        return {value: [] for value in values}
+    return _select_in(table_name, column, values)
+
+
+def delete_in(table_name: str, column: str, values: Sequence[Any]) -> int:
+    """
+    Works identical to `select_in`, except it deletes records, instead of just returning them.
+
+    :param table_name: Table on which the query should be executed
+    :param column: Column, which is compared to `values`
+    :param values: Search terms
+    :return: Number of deleted rows
+    """
+    if not values or not _check_columns(table_name, [column]):
+        return 0
+    return _delete_in(table_name, column, values)
+
+
+@auto_dict_cursor
+def _select_many(table_name: str, column: str, values: Sequence[Any], **kwargs) -> List[List[Dict[str, Any]]]:
+    cursor = kwargs.pop("cursor")
+    results: List[List[Dict[str, Any]]] = []
+    for i in range(0, len(values), _IN_CHUNK_SIZE):
+        chunk = tuple(values[i:i + _IN_CHUNK_SIZE])
+        sql_statement = " ".join([f"SELECT * FROM {table_name} WHERE {column} = %s;"] * len(chunk))
+        for result in cursor.execute(sql_statement, chunk, multi=True):
+            results.append(result.fetchall() if result.with_rows else [])
+    return results
+
+
+def select_many(table_name: str, column: str, values: Sequence[Any]) -> List[List[Dict[str, Any]]]:
+    """
+    Executes one `SELECT * FROM table_name WHERE column = value` per value, but sends all of them as a single
+    multi-statement, so they need one round trip instead of one per value.
+    If the results don't need to be kept apart per value, `select_in` is the cheaper choice.
+
+    :param table_name: Table on which the queries should be executed
+    :param column: Column, which is compared to `values`
+    :param values: Search terms
+    :return: One list of rows (as `dict`s, keys are column names) per value, in the same order as `values`
+    """
+    if not values or not _check_columns(table_name, [column]):
+        return [[] for _ in values]
+    return _select_many(table_name, column, values)
+
+
+def get_db_columns(table_name: str, **kwargs) -> List[str]:
+    """
+    Returns the column names of `table_name`. Results are cached per table, see `invalidate_columns`.
+
+    :param table_name: Name of the table
+    :param kwargs: An already checked out `connection` or `cursor` may be passed, which is used on a cache miss
+    :return: List of column names. Empty, if the table doesn't exist.
+    """
+    with _COLUMNS_CACHE_LOCK:
+        columns = _COLUMNS_CACHE.get(table_name)
+    if columns is None:
+        columns = _query_db_columns(table_name, **kwargs)
+        if columns:
+            # Unknown tables are not cached, they might be created later on
+            with _COLUMNS_CACHE_LOCK:
+                _COLUMNS_CACHE[table_name] = columns
+    return columns
+
+
 @auto_cursor
-def get_db_columns(table_name: str, **kwargs):
+def _query_db_columns(table_name: str, **kwargs) -> List[str]:
     cursor = kwargs.pop("cursor")
-    cursor.execute(f"SELECT column_name FROM INFORMATION_SCHEMA. COLUMNS WHERE TABLE_NAME = '{table_name}';")
+    cursor.execute("SELECT column_name FROM INFORMATION_SCHEMA.COLUMNS WHERE TABLE_NAME = %s;", (table_name,))
     return [column_tuple[0] for column_tuple in cursor.fetchall()]
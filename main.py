@@ -5,14 +5,11 @@ from prometheus_client import start_http_server, REGISTRY, Summary
 import settings
 
 
-logging.basicConfig(level=logging.INFO,
+logging.basicConfig(level=logging.DEBUG if settings.DEBUG else logging.INFO,
                     format="%(asctime)s [%(levelname)s]: %(message)s")
 
 
 if __name__ == '__main__':
-    if settings.DEBUG:
-        logging.getLogger().setLevel(logging.DEBUG)
-
     start_http_server(settings.PORT, settings.IP)
     try:
         import systemd.daemon
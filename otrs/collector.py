@@ -1,207 +1,517 @@
 import logging
-from datetime import datetime
-from typing import List, Dict, Tuple, Any, Optional
-
-from prometheus_client.core import GaugeMetricFamily, InfoMetricFamily, StateSetMetricFamily
-from pygtail import Pygtail
+import os
+import queue
+import select
+import signal
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, Future
+import functools
+from collections import Counter, deque
+from typing import List, Dict, Tuple, Any, Optional, Callable, Sequence, Iterator, Union, Deque, BinaryIO, NamedTuple
+
+from prometheus_client.core import GaugeMetricFamily, InfoMetricFamily, StateSetMetricFamily, CounterMetricFamily, \
+    Metric
 import subprocess
 import re
 import settings
 
-log: Pygtail = Pygtail(settings.LOGWATCH, offset_file="/dev/shm/logfile.offset")
 LOG = logging.getLogger(__name__)
+# The mail log is scanned in chunks of this many bytes
+_LOG_READ_SIZE = 1024 * 1024
+# Mail errors are reported for this many seconds after they occurred
+MAIL_ERROR_WINDOW = 900
+
+# Additional DB stats look like "12.5 MB (OK)", "123 (Info)" or "MySQL 5.7.33 (OK)"
+_RE_DB_STAT = re.compile(r"^(?:(?P<number>\d+(?:\.\d+)?)\s*(?P<unit>[KMG]B)?|(?P<text>.*?))"
+                         r"\s*(?:\((?P<status>[^()]*)\))?$")
+_DB_STAT_UNITS = {"KB": 1024, "MB": 1024 * 1024, "GB": 1024 * 1024 * 1024}
+# Characters, which are not allowed in metric names
+_RE_INVALID_METRIC_CHARS = re.compile(r"[^a-zA-Z0-9_]")
+# "Truthyness" of the Elastic Search cluster states
+_STATE_TO_BOOL = {
+    "Red": 0,
+    "Yellow": 0.5,
+    "Green": 1
+}
+# Matches entire log lines, so each line with a mail error is counted once
+_RE_MAIL_ERROR = re.compile(rb"^.*?(?:Got no email|S/MIME|Could not re-process email|PostMaster).*$", re.MULTILINE)
+
+# OTRS CLI endpoints including their arguments
+CLI_CONFIG_CHECK = ("Admin::Config::ListInvalid",)
+CLI_DAEMON_SUMMARY = ("Maint::Daemon::Summary",)
+CLI_DB_CHECK = ("Maint::Database::Check",)
+CLI_ELASTIC_CHECK = ("Maint::DocumentSearch::Check",)
+CLI_ELASTIC_INDEX_STATUS = ("Maint::DocumentSearch::IndexManagement", "--index-status", "all")
+CLI_MAIL_QUEUE = ("Maint::Email::MailQueue", "--list")
+# Endpoints, which are called on every scrape. Each of them is called only once and shared by all metrics using it.
+SCRAPE_CLI_ENDPOINTS = (CLI_CONFIG_CHECK, CLI_DAEMON_SUMMARY, CLI_DB_CHECK, CLI_ELASTIC_CHECK,
+                        CLI_ELASTIC_INDEX_STATUS, CLI_MAIL_QUEUE)
+# How long (in seconds) the output of each endpoint is reused across scrapes
+CLI_CACHE_TTLS = {
+    CLI_CONFIG_CHECK: settings.CONFIG_CHECK_CACHE_TTL,
+    CLI_DAEMON_SUMMARY: settings.DAEMON_SUMMARY_CACHE_TTL,
+    CLI_DB_CHECK: settings.DB_CHECK_CACHE_TTL,
+    CLI_ELASTIC_CHECK: settings.ELASTIC_CHECK_CACHE_TTL,
+    CLI_ELASTIC_INDEX_STATUS: settings.ELASTIC_INDEX_CACHE_TTL,
+    CLI_MAIL_QUEUE: settings.MAIL_QUEUE_CACHE_TTL,
+}
+
+# Names and descriptions of the exported metrics
+METRIC_COLLECTOR_ERRORS = ("otrs_collector_errors", "Number of failed attempts to collect a metric")
+METRIC_MAIL_ERROR = ("otrs_mail_error", "Determine via OTRS logs whether there are issues with E-Mail")
+METRIC_CONFIG_VALID = ("otrs_config_valid", "Return 1 if OTRS config is valid and 0 if not")
+METRIC_DAEMON_SUMMARY = ("otrs_daemon_summary",
+                         "The OTRS Daemon Success Rate - How many tasks monitored in the Daemon command fail.")
+METRIC_FAILING_CRONS = ("otrs_daemon_cron_jobs", "List all failing OTRS Daemon Cron Jobs")
+METRIC_DB_STATUS_OK = ("otrs_db_status_ok", "Return 1 if connection successful and 0 if not")
+METRIC_ELASTIC_STATUS_OK = ("otrs_elastic_status_ok", "Return 1 if elastic status is ok, 0 if not")
+METRIC_ELASTIC_CLUSTER_STATUS = ("otrs_elastic_cluster_status",
+                                 "Return the cluster health with the traffic light schema used by ElasticSearch")
+METRIC_ELASTIC_NODE_STATUS = ("otrs_elastic_node_status",
+                              "Return the overall node health with the traffic light schema used by ElasticSearch")
+METRIC_ELASTIC_FAILED_NODES = ("otrs_elastic_failed_nodes",
+                               "Return the granular node health with the traffic light schema used by ElasticSearch")
+METRIC_MAIL_QUEUE_EMPTY = ("otrs_elastic_status_ok", "Return 1 if mail queue empty, 0 if not")
+# Prefixes of metrics, which are exported per DB stat / Elastic Search index
+METRIC_PREFIX_DB_STATS = "otrs_additional_db_stats_"
+METRIC_PREFIX_INDEX_STATES = "otrs_elastic_index_states_"
+METRIC_PREFIX_INDEX = "otrs_elastic_index_"
+
+OTRS_CONSOLE = os.path.join(settings.OTRS_HOME, "bin", "otrs.Console.pl")
+CONSOLE_WORKER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "console_worker.pl")
+# Terminates the output of every command run by the console worker
+_WORKER_EOT = b"\x1e\n"
+# Number of CLI calls, which may run at the same time (i.e. all calls of one scrape)
+CLI_CONCURRENCY = len(SCRAPE_CLI_ENDPOINTS)
+# After this many consecutive failures, a console worker is skipped for `WORKER_BACKOFF` seconds
+WORKER_MAX_FAILURES = 3
+WORKER_BACKOFF = 300
+
+
+class _OtrsCli:
+    """
+    A long-lived console worker process (see console_worker.pl), which keeps Perl and the OTRS modules loaded between
+    CLI calls, instead of booting a new otrs.Console.pl for every single call. The process is (re-)spawned on demand.
+    """
+    _process: Optional[subprocess.Popen] = None
+    # Consecutive failed calls and the (monotonic) time until which the worker is skipped after too many of them
+    _failures: int = 0
+    _disabled_until: float = 0.0
+
+    @property
+    def available(self) -> bool:
+        return time.monotonic() >= self._disabled_until
+
+    def run(self, *cli_args: str) -> bytes:
+        if self._process is None or self._process.poll() is not None:
+            self._process = subprocess.Popen(["perl", CONSOLE_WORKER, settings.OTRS_HOME],
+                                             stdin=subprocess.PIPE, stdout=subprocess.PIPE,
+                                             stderr=subprocess.DEVNULL, bufsize=0)
+        self._process.stdin.write(("\t".join(cli_args) + "\n").encode("utf-8"))
+        deadline = time.monotonic() + settings.CLI_TIMEOUT
+        output = bytearray()
+        while not output.endswith(_WORKER_EOT):
+            timeout = deadline - time.monotonic()
+            if timeout <= 0 or not select.select([self._process.stdout], [], [], timeout)[0]:
+                self.stop()
+                raise subprocess.TimeoutExpired(cli_args, settings.CLI_TIMEOUT)
+            chunk = self._process.stdout.read(65536)
+            if not chunk:
+                raise BrokenPipeError("OTRS console worker exited unexpectedly")
+            output += chunk
+        self._failures = 0
+        # Immutable copy, as the output may be cached and handed to several scrapes
+        return bytes(output[:-len(_WORKER_EOT)])
+
+    def failed(self):
+        """
+        Stop the worker after a failed call. A worker failing permanently (e.g. as it can't load OTRS) is skipped for a
+        while, instead of being respawned for every call.
+        """
+        self.stop()
+        self._failures += 1
+        if self._failures >= WORKER_MAX_FAILURES:
+            self._failures = 0
+            self._disabled_until = time.monotonic() + WORKER_BACKOFF
+            LOG.error(f"OTRS console worker failed {WORKER_MAX_FAILURES} times in a row, "
+                      f"using otrs.Console.pl for the next {WORKER_BACKOFF}s")
+
+    def stop(self):
+        if self._process is not None:
+            self._process.kill()
+            self._process.wait()
+            self._process = None
+
+
+# One worker per concurrent CLI call, they are checked out for the duration of a call
+_cli_workers: "queue.Queue[_OtrsCli]" = queue.Queue()
+for _ in range(CLI_CONCURRENCY):
+    _cli_workers.put(_OtrsCli())
+# Reused across scrapes. The CLI calls mostly wait for their subprocess, so threads are sufficient here.
+_cli_executor = ThreadPoolExecutor(max_workers=CLI_CONCURRENCY, thread_name_prefix="otrs_cli")
+
+
+def ttl_cache(ttl: Callable[..., float]):
+    """
+    Cache the results of the decorated function per (positional) arguments for `ttl(*args)` seconds. Falsy results
+    (e.g. of failed calls) are never cached. A cached result can be dropped early via
+    `<function>.cache_invalidate(*args)`.
+
+    :param ttl: Returns the time to live (in seconds) of a result for the given arguments
+    """
+    def decorator(func):
+        # Recent results per arguments along with the (monotonic) time they were retrieved
+        cache: Dict[Tuple, Tuple[float, Any]] = {}
+        lock = threading.Lock()
+
+        @functools.wraps(func)
+        def wrapper(*args):
+            with lock:
+                cached = cache.get(args)
+            if cached is not None and time.monotonic() - cached[0] < ttl(*args):
+                return cached[1]
+            result = func(*args)
+            if result:
+                with lock:
+                    cache[args] = (time.monotonic(), result)
+            return result
+
+        def cache_invalidate(*args):
+            with lock:
+                cache.pop(args, None)
+
+        wrapper.cache_invalidate = cache_invalidate
+        return wrapper
+    return decorator
+
+
+@ttl_cache(lambda *cli_args: CLI_CACHE_TTLS.get(cli_args, settings.CLI_CACHE_TTL))
+def call_otrs_cli(*cli_args: str) -> bytes:
+    """
+    Run an OTRS CLI endpoint. Outputs are cached for a configurable time per endpoint (see `CLI_CACHE_TTLS`), so
+    scrapes in quick succession don't run the same (expensive) CLI calls again. Issues can be noticed earlier by
+    invalidating the cached output via `call_otrs_cli.cache_invalidate(*cli_args)`.
+
+    The output is kept as raw bytes, the parsers only decode the (small) parts they extract from it.
 
+    :rtype: bytes
+    :return: Output of the CLI call
+    """
+    return _run_otrs_cli(*cli_args)
+
+
+def _run_otrs_cli(*cli_args: str) -> bytes:
+    worker = _cli_workers.get()
+    try:
+        if not worker.available:
+            return _call_otrs_console(*cli_args)
+        return worker.run(*cli_args)
+    except subprocess.TimeoutExpired:
+        LOG.error(f"OTRS CLI call {' '.join(cli_args)} timed out after {settings.CLI_TIMEOUT}s!")
+        return b""
+    except OSError:
+        LOG.warning(f"OTRS console worker failed on {' '.join(cli_args)}, falling back to otrs.Console.pl")
+        worker.failed()
+        return _call_otrs_console(*cli_args)
+    except Exception:
+        # Unread output of the interrupted call would otherwise be taken for the output of the next one
+        worker.stop()
+        raise
+    finally:
+        _cli_workers.put(worker)
+
+
+def _call_otrs_console(*cli_args: str) -> bytes:
+    try:
+        return _spawn_and_read([OTRS_CONSOLE, *cli_args], settings.CLI_TIMEOUT)
+    except subprocess.TimeoutExpired:
+        LOG.error(f"OTRS CLI call {' '.join(cli_args)} timed out after {settings.CLI_TIMEOUT}s!")
+        return b""
+    except OSError:
+        LOG.exception(f"OTRS CLI call {' '.join(cli_args)} failed!")
+        return b""
+
+
+def _spawn_and_read(argv: List[str], timeout: float) -> bytes:
+    """
+    Run a command via `os.posix_spawn` and return its stdout, bypassing the (comparatively heavy) `subprocess.Popen`
+    machinery. Its stderr is discarded. Python creates fds as non-inheritable, so apart from the stdout pipe the
+    command only inherits stdin.
+
+    :raises subprocess.TimeoutExpired: If the command didn't finish within `timeout` seconds (it is killed then)
+    :rtype: bytes
+    :return: Output of the command
+    """
+    read_fd, write_fd = os.pipe()
+    try:
+        pid = os.posix_spawn(argv[0], argv, os.environ,
+                             file_actions=[(os.POSIX_SPAWN_DUP2, write_fd, 1),
+                                           (os.POSIX_SPAWN_OPEN, 2, os.devnull, os.O_WRONLY, 0)])
+    except OSError:
+        os.close(read_fd)
+        raise
+    finally:
+        os.close(write_fd)
+    try:
+        deadline = time.monotonic() + timeout
+        output = bytearray()
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([read_fd], [], [], remaining)[0]:
+                os.kill(pid, signal.SIGKILL)
+                os.waitpid(pid, 0)
+                raise subprocess.TimeoutExpired(argv, timeout)
+            chunk = os.read(read_fd, 65536)
+            if not chunk:
+                break
+            output += chunk
+        os.waitpid(pid, 0)
+        return bytes(output)
+    finally:
+        os.close(read_fd)
+
+
+def call_otrs_cli_concurrently(cli_endpoints: Sequence[Tuple[str, ...]]) -> Dict[Tuple[str, ...], "Future[bytes]"]:
+    """
+    Run all given OTRS CLI endpoints at the same time, so a scrape takes as long as the slowest call instead of the sum
+    of all calls.
 
-def call_otrs_cli(cli_endpoint: str) -> str:
-    return subprocess.run(["/opt/otrs/bin/otrs.Console.pl", cli_endpoint],
-                          stdout=subprocess.PIPE).stdout.decode("utf-8")
+    :rtype: Dict[Tuple[str, ...]:Future[bytes]]
+    :return: Mapping of CLI endpoints to their (future) output. A failed call raises its exception on `result()`.
+    """
+    return {cli_args: _cli_executor.submit(call_otrs_cli, *cli_args) for cli_args in cli_endpoints}
 
 
 class OtrsConnector:
-    _last_db_check_performed: datetime = datetime.min
-    _last_db_ok_check_performed: datetime = datetime.min
-    _last_mail_error_occurred: datetime = datetime.min
-    _db_stats_cache: dict = {}
-    _db_ok_cache: int = 0
-    _mail_fetcher_errors: int = 0
+    def __init__(self):
+        # (Monotonic time, number of new errors) of the recent log scans, which found new mail errors
+        self._mail_errors: Deque[Tuple[float, int]] = deque()
+        self._mail_errors_lock = threading.Lock()
+        threading.Thread(target=self._watch_mail_log, name="mail_log_watcher", daemon=True).start()
+        # Number of failed attempts to collect a metric, per metric
+        self._collector_errors: Dict[str, int] = Counter()
+        # (CLI output, parsed result) of the last scrape, per CLI endpoint
+        self._parsed: Dict[Tuple[str, ...], Tuple[bytes, Any]] = {}
 
     def collect(self):
-        yield self._metric_mail_error_count()
-        yield self._metric_mail_queue_empty()
-        yield self._metric_failing_crons()
-        yield self._metric_config_valid()
-        yield self._metric_db_status_ok()
-        yield from self._metric_db_additional_stats()
-        yield self._metric_daemon_summary()
-        yield self._metric_elastic_status_ok()
-        yield self._metric_elastic_cluster_status()
-        yield self._metric_elastic_all_nodes_status()
-        yield self._metric_elastic_overall_node_status()
-        yield from self._metric_elastic_index_states()
+        futures = call_otrs_cli_concurrently(SCRAPE_CLI_ENDPOINTS)
+
+        # CLI outputs are awaited and parsed within the metric builders, so a failed CLI call or unexpected output only
+        # fails the metrics depending on it
+        def output(cli_args: Tuple[str, ...]) -> bytes:
+            return futures[cli_args].result()
+
+        def parsed(cli_args: Tuple[str, ...], parser: Callable[[bytes], Any]) -> Any:
+            return self._parse(cli_args, output(cli_args), parser)
+
+        elastic_check = functools.partial(parsed, CLI_ELASTIC_CHECK, parse_elastic_check)
+        cron_jobs = functools.partial(parsed, CLI_DAEMON_SUMMARY, parse_daemon_summary)
+        db_check = functools.partial(parsed, CLI_DB_CHECK, parse_db_check)
+        metric_builders: Tuple[Tuple[str, Callable[[], Any]], ...] = (
+            ("mail_error_count", self._metric_mail_error_count),
+            ("mail_queue_empty", lambda: self._metric_mail_queue_empty(output(CLI_MAIL_QUEUE))),
+            ("failing_crons", lambda: self._metric_failing_crons(cron_jobs())),
+            ("config_valid", lambda: self._metric_config_valid(output(CLI_CONFIG_CHECK))),
+            ("db_status_ok", lambda: self._metric_db_status_ok(db_check())),
+            ("db_additional_stats", lambda: self._metric_db_additional_stats(db_check())),
+            ("daemon_summary", lambda: self._metric_daemon_summary(cron_jobs())),
+            ("elastic_status_ok", lambda: self._metric_elastic_status_ok(elastic_check())),
+            ("elastic_cluster_status", lambda: self._metric_elastic_cluster_status(elastic_check())),
+            ("elastic_all_nodes_status", lambda: self._metric_elastic_all_nodes_status(elastic_check())),
+            ("elastic_overall_node_status", lambda: self._metric_elastic_overall_node_status(elastic_check())),
+            ("elastic_index_states", lambda: self._metric_elastic_index_states(output(CLI_ELASTIC_INDEX_STATUS))),
+        )
+        metric_count = 0
+        # A single broken metric (e.g. due to unexpected CLI output) must not fail the whole scrape
+        for name, build_metric in metric_builders:
+            try:
+                metrics = build_metric()
+                for metric in (metrics,) if isinstance(metrics, Metric) else metrics:
+                    metric_count += 1
+                    yield metric
+            except Exception:
+                LOG.exception(f"Failed to collect the {name} metric")
+                self._collector_errors[name] += 1
+        yield self._metric_collector_errors([name for name, _ in metric_builders])
+        LOG.debug("Collected %d metrics", metric_count + 1)
+
+    def _parse(self, cli_args: Tuple[str, ...], otrs_cli_out: bytes, parser: Callable[[bytes], Any]) -> Any:
+        """
+        Parse the output of a CLI endpoint, unless it is the very same (cached, see `ttl_cache()`) output as in the last
+        scrape, in which case the result of the last parse is reused.
+
+        :rtype: Any
+        :return: Result of the parser
+        """
+        last = self._parsed.get(cli_args)
+        if last is not None and last[0] is otrs_cli_out:
+            return last[1]
+        parsed = parser(otrs_cli_out)
+        self._parsed[cli_args] = (otrs_cli_out, parsed)
+        return parsed
+
+    def _metric_collector_errors(self, names: List[str]) -> CounterMetricFamily:
+        metric = CounterMetricFamily(*METRIC_COLLECTOR_ERRORS, labels=["metric"])
+        for name in names:
+            metric.add_metric([name], self._collector_errors[name])
+        return metric
+
+    def _watch_mail_log(self):
+        """
+        Scan the mail log for new errors every `settings.LOGWATCH_INTERVAL` seconds in the background, so errors are
+        noticed independent of scrapes and scrapes don't have to wait for the scan.
+        """
+        while True:
+            try:
+                new_errors = get_mail_fetcher_errors()
+                if new_errors > 0:
+                    with self._mail_errors_lock:
+                        self._mail_errors.append((time.monotonic(), new_errors))
+            except Exception:
+                LOG.exception(f"Failed to scan {settings.LOGWATCH} for mail errors")
+            time.sleep(settings.LOGWATCH_INTERVAL)
 
     def _metric_mail_error_count(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_mail_error",
-                                   "Determine via OTRS logs whether there are issues with E-Mail")
-        LOG.debug("Added mail error count metric")
-        delta = datetime.now() - self._last_mail_error_occurred
-        new_errors = get_mail_fetcher_errors()
-        if delta.seconds < 900:
-            self._mail_fetcher_errors = self._mail_fetcher_errors + new_errors
-        else:
-            self._mail_fetcher_errors = new_errors
-        if new_errors > 0:
-            self._last_mail_error_occurred = datetime.now()
-        metric.add_metric([], self._mail_fetcher_errors)
+        metric = GaugeMetricFamily(*METRIC_MAIL_ERROR)
+        now = time.monotonic()
+        with self._mail_errors_lock:
+            while self._mail_errors and now - self._mail_errors[0][0] > MAIL_ERROR_WINDOW:
+                self._mail_errors.popleft()
+            mail_errors = sum(errors for _, errors in self._mail_errors)
+        metric.add_metric([], mail_errors)
         return metric
 
-    def _metric_config_valid(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_config_valid",
-                                   "Return 1 if OTRS config is valid and 0 if not")
-        LOG.debug("Added OTRS valid config metric")
-        metric.add_metric([], is_config_valid())
+    def _metric_config_valid(self, otrs_cli_out: bytes) -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_CONFIG_VALID)
+        config_valid = is_config_valid(otrs_cli_out)
+        if not config_valid:
+            call_otrs_cli.cache_invalidate(*CLI_CONFIG_CHECK)
+        metric.add_metric([], config_valid)
         return metric
 
-    def _metric_daemon_summary(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_daemon_summary",
-                                   "The OTRS Daemon Success Rate - How many tasks monitored in the Daemon command "
-                                   "fail.")
-        LOG.debug("Added OTRS daemon success rate metric")
-        metric.add_metric([], get_job_success_rate())
+    def _metric_daemon_summary(self, cron_jobs: List[Tuple[str, str]]) -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_DAEMON_SUMMARY)
+        metric.add_metric([], get_job_success_rate(cron_jobs))
         return metric
 
-    def _metric_failing_crons(self) -> InfoMetricFamily:
-        metric = InfoMetricFamily("otrs_daemon_cron_jobs",
-                                  "List all failing OTRS Daemon Cron Jobs")
-        LOG.debug("Added failing cron job metric")
-        metric.add_metric([], get_failing_crons())
+    def _metric_failing_crons(self, cron_jobs: List[Tuple[str, str]]) -> InfoMetricFamily:
+        metric = InfoMetricFamily(*METRIC_FAILING_CRONS)
+        metric.add_metric([], get_failing_crons(cron_jobs))
         return metric
 
-    def _metric_successful_crons(self) -> InfoMetricFamily:
-        metric = InfoMetricFamily("otrs_daemon_cron_jobs",
-                                  "List all failing OTRS Daemon Cron Jobs")
-        LOG.debug("Added failing cron job metric")
-        metric.add_metric([], get_successful_crons())
+    def _metric_successful_crons(self, cron_jobs: List[Tuple[str, str]]) -> InfoMetricFamily:
+        metric = InfoMetricFamily(*METRIC_FAILING_CRONS)
+        metric.add_metric([], get_successful_crons(cron_jobs))
         return metric
 
-    def _metric_db_status_ok(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_db_status_ok",
-                                   "Return 1 if connection successful and 0 if not")
-        LOG.debug("Added Db status ok metric")
-        delta = datetime.now() - self._last_db_ok_check_performed
-        if delta.seconds > 900:
-            self._db_ok_cache = get_db_status()
-            self._last_db_ok_check_performed = datetime.now()
-        metric.add_metric([], self._db_ok_cache)
+    def _metric_db_status_ok(self, db_check: "DbCheck") -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_DB_STATUS_OK)
+        metric.add_metric([], db_check.connection_ok)
         return metric
 
-    def _metric_db_additional_stats(self):
-        LOG.debug("Added additional db stats metric")
-        delta = datetime.now() - self._last_db_check_performed
-        if delta.seconds > 900:
-            self._db_stats_cache = get_additional_db_stats()
-            self._last_db_check_performed = datetime.now()
-        stats_dict: Dict[str, List] = {"otrs_additional_db_stats_" + str(k): v.split(" ")
-                                       for k, v in self._db_stats_cache.items()}
-        metrics = []
-        stats_dict = prepare_additional_stats_dict(stats_dict)
-        for key, value in stats_dict.items():
-            metric = GaugeMetricFamily(key, "")
-            if type(value[0]) == str and len(value) > 1:
+    def _metric_db_additional_stats(self, db_check: "DbCheck"):
+        for name, (value, status) in db_check.stats.items():
+            key = METRIC_PREFIX_DB_STATS + name
+            if status not in ("OK", "Info"):
+                metric = GaugeMetricFamily(key, "")
+                metric.add_metric([], 0)
+            elif isinstance(value, float):
+                metric = GaugeMetricFamily(key, "")
+                metric.add_metric([], value)
+            else:
                 metric = InfoMetricFamily(key, "")
-            if value[-1] not in ["Info", "OK"]:
-                metric.add_metric([], {"NOK": 0})
-            elif "Info" in value[-1]:
-                metric.add_metric([], value[0])
-            elif "OK" in value[-1]:
-                if type(value[0]) == str:
-                    if type(metric) == InfoMetricFamily:
-                        metric.add_metric([], {"OK": value[0]})
-                    elif type(metric) == GaugeMetricFamily:
-                        metric.add_metric([], 1)
-                else:
-                    metric.add_metric([], value[0])
-            metrics.append(metric)
-        return metrics
-
-    def _metric_elastic_status_ok(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_elastic_status_ok",
-                                   "Return 1 if elastic status is ok, 0 if not")
-        LOG.debug("Added elastic status ok metric")
-        metric.add_metric([], get_elastic_status())
+                metric.add_metric([], {status: value})
+            yield metric
+
+    def _metric_elastic_status_ok(self, elastic_check: "ElasticCheck") -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_ELASTIC_STATUS_OK)
+        if not elastic_check.connection_ok:
+            call_otrs_cli.cache_invalidate(*CLI_ELASTIC_CHECK)
+        metric.add_metric([], elastic_check.connection_ok)
         return metric
 
-    def _metric_elastic_cluster_status(self) -> StateSetMetricFamily:
-        metric = StateSetMetricFamily("otrs_elastic_cluster_status",
-                                      "Return the cluster health with the traffic light schema used by ElasticSearch")
-        LOG.debug("Added elastic cluster status metric")
-        metric.add_metric([], get_elastic_overall_cluster_status())
+    def _metric_elastic_cluster_status(self, elastic_check: "ElasticCheck") -> StateSetMetricFamily:
+        metric = StateSetMetricFamily(*METRIC_ELASTIC_CLUSTER_STATUS)
+        metric.add_metric([], get_elastic_overall_cluster_status(elastic_check.cluster_states))
         return metric
 
-    def _metric_elastic_overall_node_status(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_elastic_node_status",
-                                   "Return the overall node health with the traffic light schema used by "
-                                   "ElasticSearch")
-        LOG.debug("Added elastic node status metric")
-        metric.add_metric([], get_elastic_overall_nodes_status())
+    def _metric_elastic_overall_node_status(self, elastic_check: "ElasticCheck") -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_ELASTIC_NODE_STATUS)
+        metric.add_metric([], get_elastic_overall_nodes_status(elastic_check.node_states))
         return metric
 
-    def _metric_elastic_all_nodes_status(self) -> InfoMetricFamily:
-        metric = InfoMetricFamily("otrs_elastic_failed_nodes",
-                                  "Return the granular node health with the traffic light schema used by ElasticSearch")
-        LOG.debug("Added elastic node status metric")
-        metric.add_metric([], get_elastic_all_nodes_states())
+    def _metric_elastic_all_nodes_status(self, elastic_check: "ElasticCheck") -> InfoMetricFamily:
+        metric = InfoMetricFamily(*METRIC_ELASTIC_FAILED_NODES)
+        metric.add_metric([], get_elastic_all_nodes_states(elastic_check.nodes, elastic_check.node_states))
         return metric
 
-    def _metric_elastic_index_states(self):
-        LOG.debug("Added elastic index status metric")
-        metrics = []
-        indices = get_elastic_index_states()
-        avail = {key: val for key, val in indices.items() if "avail" in key}
-        indexed = {key: val for key, val in indices.items() if "indexed" in key}
-        keys = [entry.rsplit("_", 1)[0] + "_percentage" for entry in indices.keys()]
-        values_avail = [float(val) for val in avail.values()]
-        values_indexed = [float(val) for val in indexed.values()]
-        values = []
-        for x, y in zip(values_indexed, values_avail):
-            if y == 0:
-                values.append(float(1.0))
-            else:
-                values.append(float(x) / float(y))
-        percentages = dict(zip(keys, values))
-        for key, value in indices.items():
-            metric = GaugeMetricFamily("otrs_elastic_index_states_" + key, "")
-            metric.add_metric([], float(value))
-            metrics.append(metric)
-        for key, value in percentages.items():
-            metric = GaugeMetricFamily("otrs_elastic_index_" + key, "")
-            metric.add_metric([], float(value))
-            metrics.append(metric)
-        return metrics
-
-    def _metric_mail_queue_empty(self) -> GaugeMetricFamily:
-        metric = GaugeMetricFamily("otrs_elastic_status_ok",
-                                   "Return 1 if mail queue empty, 0 if not")
-        LOG.debug("Added mail queue empty metric")
-        metric.add_metric([], get_mail_queue_empty())
+    def _metric_elastic_index_states(self, otrs_cli_out: bytes):
+        # Document counts per index and kind ("avail" / "indexed")
+        counts: Dict[str, Dict[str, float]] = {}
+        for key, value in get_elastic_index_states(otrs_cli_out).items():
+            index, kind = key.rsplit("_", 1)
+            counts.setdefault(index, {})[kind] = float(value)
+        for index, index_counts in counts.items():
+            for kind, value in index_counts.items():
+                metric = GaugeMetricFamily(f"{METRIC_PREFIX_INDEX_STATES}{index}_{kind}", "")
+                metric.add_metric([], value)
+                yield metric
+            avail = index_counts.get("avail", 0)
+            metric = GaugeMetricFamily(f"{METRIC_PREFIX_INDEX}{index}_percentage", "")
+            metric.add_metric([], index_counts.get("indexed", 0) / avail if avail else 1.0)
+            yield metric
+
+    def _metric_mail_queue_empty(self, otrs_cli_out: bytes) -> GaugeMetricFamily:
+        metric = GaugeMetricFamily(*METRIC_MAIL_QUEUE_EMPTY)
+        mail_queue_empty = get_mail_queue_empty(otrs_cli_out)
+        if not mail_queue_empty:
+            call_otrs_cli.cache_invalidate(*CLI_MAIL_QUEUE)
+        metric.add_metric([], mail_queue_empty)
         return metric
 
 
-def get_mail_queue_empty() -> int:
+def get_mail_queue_empty(otrs_cli_out: bytes) -> int:
     """
     Determine if mail queue is empty, for mail issue diagnosis.
 
     :rtype: int
     :return: Empty (1), Non-Empty (0)
     """
-    otrs_cli_out: str = subprocess.run(["/opt/otrs/bin/otrs.Console.pl", "Maint::Email::MailQueue", "--list"],
-                                       stdout=subprocess.PIPE).stdout.decode("utf-8")
-    if "Mail queue is empty." in otrs_cli_out:
+    if b"Mail queue is empty." in otrs_cli_out:
         return 1
     else:
         return 0
 
 
-def get_elastic_index_states() -> Dict[str, str]:
+def _table_rows(otrs_cli_out: bytes) -> Iterator[List[bytes]]:
+    """
+    Iterate over the rows of the ASCII tables printed by the OTRS CLI, e.g. `| Ticket | 100 | 90 |`.
+
+    :rtype: Iterator[List[bytes]]
+    :return: Stripped cells of each table row
+    """
+    for line in otrs_cli_out.splitlines():
+        cells = _table_cells(line.strip())
+        if cells is not None:
+            yield cells
+
+
+def _table_cells(line: bytes) -> Optional[List[bytes]]:
+    if len(line) > 1 and line[:1] == b"|" and line[-1:] == b"|":
+        return [cell.strip() for cell in line[1:-1].split(b"|")]
+    return None
+
+
+@functools.lru_cache(maxsize=256)
+def _to_snake_case(name: str) -> str:
+    # The index names hardly ever change, so the conversion is only done once per name. As they become part of metric
+    # names, invalid characters (e.g. "-" or ".") are replaced.
+    snake_case = "".join("_" + char.lower() if char.isupper() and i else char.lower() for i, char in enumerate(name))
+    return _RE_INVALID_METRIC_CHARS.sub("_", snake_case)
+
+
+def get_elastic_index_states(otrs_cli_out: bytes) -> Dict[str, str]:
     """
     Parse the document indexing status for all OTRS Elastic Search Indices.
 
@@ -209,33 +519,71 @@ def get_elastic_index_states() -> Dict[str, str]:
     :return: Indices _avail and _indexed document count per index
     """
     # TODO str:int would make more sense here
-    otrs_cli_out: str = subprocess.run(["/opt/otrs/bin/otrs.Console.pl",
-                                        "Maint::DocumentSearch::IndexManagement", "--index-status", "all"],
-                                       stdout=subprocess.PIPE).stdout.decode("utf-8")
-    indices: List[str] = re.compile(r"^\s+\|\s+(\w+)\s+\|\s+(\d+)\s+\|\s+(\d+)\s+\|.*$", re.MULTILINE).findall(
-        otrs_cli_out)
-    indices_indexed = {re.sub(r'(?<!^)(?=[A-Z])', '_', index[0]).lower() + "_indexed": index[2] for index in indices}
-    indices_avail = {re.sub(r'(?<!^)(?=[A-Z])', '_', index[0]).lower() + "_avail": index[1] for index in indices}
-    indices_dict = indices_indexed
-    indices_dict.update(indices_avail)
+    indices_dict = {}
+    for row in _table_rows(otrs_cli_out):
+        if len(row) < 3 or not row[1].isdigit() or not row[2].isdigit():
+            continue
+        name, avail, indexed = row[:3]
+        index = _to_snake_case(name.decode("utf-8", errors="replace"))
+        indices_dict[index + "_indexed"] = indexed.decode("ascii")
+        indices_dict[index + "_avail"] = avail.decode("ascii")
     return indices_dict
 
 
-def get_elastic_all_nodes_states() -> Dict[str, str]:
+class ElasticCheck(NamedTuple):
+    """
+    Everything the Elastic Search metrics need from the output of the Elastic Search check.
+    """
+    connection_ok: int
+    nodes: List[str]
+    node_states: List[str]
+    cluster_states: List[str]
+
+
+def parse_elastic_check(otrs_cli_out: bytes) -> ElasticCheck:
+    """
+    Parse the connection status, all node names, node states and cluster states from the output of the Elastic Search
+    check in one pass.
+
+    :rtype: ElasticCheck
+    :return: Connection Status (1/0) and node names, node states and cluster states in order of appearance
+    """
+    connection_ok = 0
+    nodes: List[str] = []
+    node_states: List[str] = []
+    cluster_states: List[str] = []
+    for line in otrs_cli_out.splitlines():
+        line = line.strip()
+        if b"Connection successful." in line:
+            connection_ok = 1
+            continue
+        row = _table_cells(line)
+        if row is None or len(row) != 2 or not row[1]:
+            continue
+        key, value = row
+        if key == b"Node":
+            nodes.append(value.decode("utf-8", errors="replace"))
+        elif key == b"Status":
+            # Node states look like "On-line" (i.e. contain a separator), while cluster states look like "Green"
+            if value.isalnum():
+                cluster_states.append(value.decode("utf-8", errors="replace"))
+            else:
+                node_states.append(value.decode("utf-8", errors="replace"))
+    return ElasticCheck(connection_ok, nodes, node_states, cluster_states)
+
+
+def get_elastic_all_nodes_states(nodes: List[str], node_states: List[str]) -> Dict[str, str]:
     """
     List all individual node states in the Elastic Search Traffic Light Pattern.
 
     :rtype: dict
     :return: Mapping from node name to state
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::DocumentSearch::Check")
-    nodes: List[str] = re.compile(r"^\s+\|\s+Node\s+\|\s+(\w+)\s+\|$", re.MULTILINE).findall(otrs_cli_out)
-    states: List[str] = re.compile(r"^\s+\|\s+Status\s+\|\s+(\w+\W\w+)\s+\|$", re.MULTILINE).findall(otrs_cli_out)
-    node_to_state = {n: s for n, s in zip(nodes, states)}
+    node_to_state = {n: s for n, s in zip(nodes, node_states)}
     return node_to_state
 
 
-def get_elastic_overall_nodes_status() -> float:
+def get_elastic_overall_nodes_status(node_states: List[str]) -> float:
     """
     Determine a general status for the nodes from looking at all nodes individually. "On-line" is good / expected,
     everything else might lead to errors.
@@ -244,9 +592,7 @@ def get_elastic_overall_nodes_status() -> float:
     :return: Mapping from Red, Yellow, Green to "Truthyness"
     """
     # TODO figure out why this yields: otrs_elastic_node_status{otrs_elastic_node_status="Green"} 1.0
-    otrs_cli_out: str = call_otrs_cli("Maint::DocumentSearch::Check")
-    states: List[str] = re.compile(r"^\s+\|\s+Status\s+\|\s+(\w+\W\w+)\s+\|$", re.MULTILINE).findall(otrs_cli_out)
-    unique_status = set(states)
+    unique_status = set(node_states)
     if "On-line" not in unique_status:
         return 0
     # If one node goes bad, the overall node state should turn bad
@@ -256,153 +602,215 @@ def get_elastic_overall_nodes_status() -> float:
         return 1
 
 
-def get_elastic_overall_cluster_status() -> dict:
+def get_elastic_overall_cluster_status(cluster_states: List[str]) -> dict:
     """
     Retrieve the overall Elastic Cluster Status from OTRS.
 
     :rtype: dict
     :return: Mapping from Red, Yellow, Green to "Truthyness"
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::DocumentSearch::Check")
-    matching: List[str] = re.compile(r"^\s+\|\s+Status\s+\|\s+(\w+)\s+\|$", re.MULTILINE).findall(otrs_cli_out)
-    state_to_bool = {
-        "Red": 0,
-        "Yellow": 0.5,
-        "Green": 1
-    }
-    result = {}
-    for match in matching:
-        result[match] = state_to_bool[match]
-    return result
+    return {state: _STATE_TO_BOOL[state] for state in set(cluster_states)}
 
 
-def get_elastic_status() -> int:
+class DbCheck(NamedTuple):
     """
-    Analogous to the get_db_status() method. Retrieve if connection to ElasticSearch Cluster is up or not.
-
-    :rtype: int
-    :return: Connection Status (True/False)
+    Everything the DB metrics need from the output of the DB check.
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::DocumentSearch::Check")
-    if "Connection successful." in otrs_cli_out:
-        return 1
-    else:
-        return 0
+    connection_ok: int
+    # Mapping of additional stats (i.e. their names) to their parsed results, see `parse_db_stat()`
+    stats: Dict[str, Tuple[Union[float, str], str]]
 
 
-def get_additional_db_stats() -> Dict[str, str]:
+def parse_db_check(otrs_cli_out: bytes) -> DbCheck:
     """
-    The OTRS DB Check retrieves additional stats (takes a long time) which we print here.
+    Parse the connection status and the additional stats (takes a long time to check) from the output of the DB check
+    in one pass.
 
-    :rtype: Dict[str:str]
-    :return: Mapping of Checks (i.e. their names) to their results
+    :rtype: DbCheck
+    :return: Connection Status (1/0) and mapping of additional stats to their values and status
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::Database::Check")
-    matching: List[str] = re.compile(r"^(\w[\w\s]+)\: (.*)$", re.MULTILINE).findall(otrs_cli_out)
-    return {match[0].lower().replace(" ", "_"):
-            match[1].strip(" ").strip("(").strip(")").replace(" (", " - ")
-            for match in matching}
-
-
-def get_db_status() -> int:
+    connection_ok = 0
+    stats = {}
+    for line in otrs_cli_out.splitlines():
+        if b"Connection successful." in line:
+            connection_ok = 1
+            continue
+        key, separator, value = line.partition(b": ")
+        # Skip lines, which merely contain a colon, e.g. "Trying to connect to database 'DSN: ...", as well as indented
+        # (i.e. continuation) lines
+        if separator and key[:1].isalnum() and key.replace(b" ", b"").replace(b"_", b"").isalnum():
+            stat_name = key.decode("ascii").lower().replace(" ", "_")
+            stats[stat_name] = parse_db_stat(value.decode("utf-8", errors="replace").strip())
+    return DbCheck(connection_ok, stats)
+
+
+def parse_daemon_summary(otrs_cli_out: bytes) -> List[Tuple[str, str]]:
     """
-    Determine via OTRS CLI if the database is connected properly or not.
+    Parse all cron jobs, which are marked with "Success" or "Fail", from the output of the Daemon Summary in one pass.
 
-    :rtype: int
-    :return: Connection okay or not okay
+    :rtype: List[Tuple[str, str]]
+    :return: Cron job names and their status ("Success" or "Fail") in order of appearance
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::Database::Check")
-    if "Connection successful." in otrs_cli_out:
-        return 1
-    else:
-        return 0
-
-
-def get_successful_crons() -> Dict[str, str]:
+    cron_jobs: List[Tuple[str, str]] = []
+    for row in _table_rows(otrs_cli_out):
+        if len(row) < 3 or not row[0].isalnum():
+            continue
+        if row[2].startswith(b"Success"):
+            cron_jobs.append((row[0].decode("ascii"), "Success"))
+        elif row[2].startswith(b"Fail"):
+            cron_jobs.append((row[0].decode("ascii"), "Fail"))
+    return cron_jobs
+
+
+def get_successful_crons(cron_jobs: List[Tuple[str, str]]) -> Dict[str, str]:
     """
     Get the names of all cron jobs that are marked with "Success" and return those in a dictionary.
 
     :rtype: Dict[str:str]
     :return: Mapping of cron job names to 1
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::Daemon::Summary")
-    matching: List[str] = re.compile(r"^\s*\|\s*([A-Za-z0-9]+)\s*\|\s*[\s\d:\-]*\|\s*Success", re.MULTILINE).findall(
-        otrs_cli_out)
-    return {match: "1" for match in matching}
+    return {name: "1" for name, status in cron_jobs if status == "Success"}
 
 
-def get_failing_crons() -> Dict[str, str]:
+def get_failing_crons(cron_jobs: List[Tuple[str, str]]) -> Dict[str, str]:
     """
     Get the names of all cron jobs that are marked with "Fail" and return those in a dictionary.
 
     :rtype: Dict[str:str]
     :return: Mapping of cron job names to 0
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::Daemon::Summary")
-    matching: List[str] = re.compile(r"^\s*\|\s*([A-Za-z0-9]+)\s*\|\s*[\s\d:\-]*\|\s*Fail", re.MULTILINE).findall(
-        otrs_cli_out)
-    return {match: "0" for match in matching}
+    return {name: "0" for name, status in cron_jobs if status == "Fail"}
 
 
-def get_job_success_rate() -> float:
+def get_job_success_rate(cron_jobs: List[Tuple[str, str]]) -> float:
     """
-    Return the OTRS Daemon Total Job Success Rate, i.e. count all occurrences of the word "Fail" in the output and
-    divide by the total amount of jobs (which are determined by adding the jobs marked as "Success".
+    Return the OTRS Daemon Total Job Success Rate, i.e. count all jobs marked as "Success" and divide by the total
+    amount of jobs (which are marked as either "Success" or "Fail").
 
     :rtype: float
-    :return: OTRS Daemon Job Success Rate
+    :return: OTRS Daemon Job Success Rate, 0.0 if there are no jobs at all (e.g. the daemon is down)
     """
-    otrs_cli_out: str = call_otrs_cli("Maint::Daemon::Summary")
-    daemon_success = otrs_cli_out.count("Success")
-    daemon_total = daemon_success + otrs_cli_out.count("Fail")
-    return daemon_success / daemon_total
+    if not cron_jobs:
+        return 0.0
+    return sum(1 for _, status in cron_jobs if status == "Success") / len(cron_jobs)
 
 
-def is_config_valid() -> int:
+def is_config_valid(otrs_cli_out: bytes) -> int:
     """
     Parse the output of the Config Check and determine if said config is valid or not.
 
     :rtype: int
     :return: valid / not valid config
     """
-    otrs_cli_out: str = call_otrs_cli("Admin::Config::ListInvalid")
-    if "All settings are valid." in otrs_cli_out:
+    if b"All settings are valid." in otrs_cli_out:
         return 1
     else:
         return 0
 
 
+class _MailLogTailer:
+    """
+    Follows a log file like `tail -F`, i.e. across rotation and truncation, and counts the mail errors in the lines
+    written since the last call. The log is kept open, so lines written to a rotated log after the last call are still
+    counted. Only complete lines are scanned. They are read as raw bytes in large chunks into a buffer, which is reused
+    for every read, as the error strings are plain ASCII anyway.
+    """
+    _file: Optional[BinaryIO] = None
+    _inode: Optional[int] = None
+    _offset: int = 0
+
+    def __init__(self, path: str):
+        self.path = path
+        self._buffer = bytearray(_LOG_READ_SIZE)
+
+    def count_new_errors(self) -> int:
+        try:
+            log_stat = os.stat(self.path)
+        except FileNotFoundError:
+            if self._file is not None or self._inode is None:
+                LOG.warning(f"Log file {self.path} does not exist!")
+            # Once the log is created, it is read from its start
+            self._inode = -1
+            return self._close()
+        error_count = 0
+        if log_stat.st_ino != self._inode:
+            # The log has been rotated in the meantime (or is opened for the first time), so the rest of the rotated
+            # log is scanned before following the new one.
+            error_count += self._close()
+            first_open = self._inode is None
+            self._file = open(self.path, "rb", buffering=0)
+            self._inode = log_stat.st_ino
+            # Errors logged before the exporter was started are not reported
+            self._offset = log_stat.st_size if first_open else 0
+        elif log_stat.st_size < self._offset:
+            # The log has been truncated in the meantime
+            self._offset = 0
+        if log_stat.st_size > self._offset:
+            error_count += self._scan()
+        return error_count
+
+    def _scan(self) -> int:
+        error_count = 0
+        self._file.seek(self._offset)
+        buffer = self._buffer
+        # Length of the partial line at the start of the buffer
+        partial = 0
+        with memoryview(buffer) as view:
+            while True:
+                read = self._file.readinto(view[partial:])
+                if not read:
+                    break
+                size = partial + read
+                # A partial last line is kept for the next read or, if it is the end of the file, the next call
+                end = buffer.rfind(b"\n", 0, size) + 1
+                if end == 0 and size == len(buffer):
+                    # A single line doesn't fit into the buffer, so it is scanned in parts
+                    end = size
+                error_count += sum(1 for _ in _RE_MAIL_ERROR.finditer(buffer, 0, end))
+                self._offset += end
+                partial = size - end
+                view[:partial] = view[end:size]
+        return error_count
+
+    def _close(self) -> int:
+        """
+        Close the log after scanning its remaining lines.
+
+        :rtype: int
+        :return: Occurrence of the mail errors in the remaining lines
+        """
+        if self._file is None:
+            return 0
+        try:
+            return self._scan()
+        finally:
+            self._file.close()
+            self._file = None
+
+
+_mail_log = _MailLogTailer(settings.LOGWATCH)
+
+
 def get_mail_fetcher_errors() -> int:
     """
     Determine on some manually gathered strings issues within the Daemon logs regarding mail processing.
 
     :rtype: int
-    :return: Occurrence of the mail errors in the current open file
-    """
-    error_count = 0
-    for line in log:
-        if any(s in line for s in ["Got no email",
-                                   "S/MIME",
-                                   "Could not re-process email",
-                                   "PostMaster"]):
-            error_count += 1
-    return error_count
-
-
-def prepare_additional_stats_dict(stats_dict: Dict) -> Dict:
-    for key, value in stats_dict.items():
-        if len(value) > 1:
-            del value[-2]
-            try:
-                if value[1] == "MB":
-                    value[0] = float(value[0]) * 1024 * 1024
-                if value[1] == "GB":
-                    value[0] = float(value[0]) * 1024 * 1024 * 1024
-                del value[-2]
-            except ValueError:
-                pass
-            if len(value) == 3:
-                value[0] = str(value[0] + " " + value[1])
-                value[1] = value[2]
-                del value[-2]
-    return stats_dict
+    :return: Occurrence of the mail errors written to the log since the last call
+    """
+    return _mail_log.count_new_errors()
+
+
+def parse_db_stat(raw_value: str) -> Tuple[Union[float, str], str]:
+    """
+    Parse the result of an additional DB stat, i.e. "<number> [<unit>] (<status>)" or "<text> (<status>)". Sizes are
+    converted to bytes.
+
+    :rtype: Tuple[Union[float, str], str]
+    :return: Numeric (float) or textual value and status ("OK", "Info", anything else means not OK)
+    """
+    match = _RE_DB_STAT.match(raw_value)
+    status = match["status"] or ""
+    if match["number"] is None:
+        return match["text"], status
+    return float(match["number"]) * _DB_STAT_UNITS.get(match["unit"], 1), status
@@ -0,0 +1,42 @@
+#!/usr/bin/perl
+# Long-lived otrs.Console.pl used by the OTRS Prometheus Exporter.
+#
+# Loads the OTRS modules once and then reads one command per line from STDIN (arguments are separated by tabs).
+# Each command is run like "otrs.Console.pl <arguments>" would run it, its output is terminated by a record
+# separator ("\x1e") followed by a newline.
+#
+# Usage: console_worker.pl [OTRS home, defaults to /opt/otrs]
+
+use strict;
+use warnings;
+
+my $Home;
+
+BEGIN {
+    $Home = shift(@ARGV) // '/opt/otrs';
+    unshift @INC, $Home, "$Home/Kernel/cpan-lib", "$Home/Custom";
+}
+
+use Kernel::System::ObjectManager;
+use Kernel::System::Console;
+
+$| = 1;
+
+while ( my $Line = <STDIN> ) {
+    chomp $Line;
+    my @Arguments = grep { length } split /\t/, $Line;
+
+    if (@Arguments) {
+
+        # A fresh object manager per command, so no state (config, caches, DB handles) leaks between commands
+        local $Kernel::OM = Kernel::System::ObjectManager->new(
+            'Kernel::System::Log' => {
+                LogPrefix => 'OTRS-otrs.Console.pl',
+            },
+        );
+        eval { $Kernel::OM->Get('Kernel::System::Console')->Run(@Arguments); };
+        print STDERR $@ if $@;
+    }
+
+    print "\x1e\n";
+}
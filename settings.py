@@ -2,9 +2,20 @@ import os
 
 PORT = int(os.getenv("OTRS_EXP_PORT", 9875))
 IP = os.getenv("OTRS_EXP_IP", "0.0.0.0")
-DEBUG = os.getenv("OTRS_EXP_DEBUG", True)
+DEBUG = os.getenv("OTRS_EXP_DEBUG", "").lower() in ("1", "true", "yes")
 DB_USER = os.getenv("OTRS_EXP_DB_USER", "otrs")
 DB_PW = os.getenv("OTRS_EXP_DB_PW")
 DB_NAME = os.getenv("OTRS_EXP_DB_NAME", "otrs")
 DB_HOST = os.getenv("OTRS_EXP_DB_HOST", "127.0.0.1")
+DB_POOL_SIZE = int(os.getenv("OTRS_EXP_DB_POOL_SIZE", 4))
+OTRS_HOME = os.getenv("OTRS_EXP_OTRS_HOME", "/opt/otrs")
+CLI_TIMEOUT = int(os.getenv("OTRS_EXP_CLI_TIMEOUT", 60))
+CLI_CACHE_TTL = int(os.getenv("OTRS_EXP_CLI_CACHE_TTL", 10))
+CONFIG_CHECK_CACHE_TTL = int(os.getenv("OTRS_EXP_CONFIG_CHECK_CACHE_TTL", CLI_CACHE_TTL))
+DAEMON_SUMMARY_CACHE_TTL = int(os.getenv("OTRS_EXP_DAEMON_SUMMARY_CACHE_TTL", CLI_CACHE_TTL))
+DB_CHECK_CACHE_TTL = int(os.getenv("OTRS_EXP_DB_CHECK_CACHE_TTL", 900))
+ELASTIC_CHECK_CACHE_TTL = int(os.getenv("OTRS_EXP_ELASTIC_CHECK_CACHE_TTL", CLI_CACHE_TTL))
+ELASTIC_INDEX_CACHE_TTL = int(os.getenv("OTRS_EXP_ELASTIC_INDEX_CACHE_TTL", CLI_CACHE_TTL))
+MAIL_QUEUE_CACHE_TTL = int(os.getenv("OTRS_EXP_MAIL_QUEUE_CACHE_TTL", CLI_CACHE_TTL))
 LOGWATCH = os.getenv("OTRS_EXP_LOG_PATH", "/opt/otrs/var/log/Daemon/SchedulerTaskWorkerERR.log")
+LOGWATCH_INTERVAL = int(os.getenv("OTRS_EXP_LOG_INTERVAL", 5))
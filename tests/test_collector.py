@@ -0,0 +1,33 @@
+import unittest
+
+from otrs.collector import is_config_valid, get_mail_queue_empty, parse_db_check
+
+
+class TestStatusMarkers(unittest.TestCase):
+    def test_marker_anywhere_in_output(self):
+        marker = b"All settings are valid."
+        for position in (0, 500, 1000):
+            otrs_cli_out = b"x" * position + marker
+            otrs_cli_out += b"x" * (1024 - len(otrs_cli_out))
+            with self.subTest(position=position):
+                self.assertEqual(is_config_valid(otrs_cli_out), 1)
+
+    def test_marker_missing(self):
+        self.assertEqual(is_config_valid(b"x" * 1024), 0)
+        self.assertEqual(get_mail_queue_empty(b""), 0)
+
+
+class TestDbCheck(unittest.TestCase):
+    def test_only_unindented_stats(self):
+        otrs_cli_out = (b"Trying to connect to database 'DSN: DBI:mysql:database=otrs;host=localhost'...\n"
+                        b"Connection successful.\n"
+                        b"Table Count: 123 (OK)\n"
+                        b"  Table Foo: 12\n"
+                        b"\tcontinued: on the next line\n")
+        db_check = parse_db_check(otrs_cli_out)
+        self.assertEqual(db_check.connection_ok, 1)
+        self.assertEqual(db_check.stats, {"table_count": (123.0, "OK")})
+
+
+if __name__ == "__main__":
+    unittest.main()